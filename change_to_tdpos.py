@@ -4,10 +4,17 @@ import subprocess
 import time
 import os
 import re
-import datetime
+import shutil
+import selectors
 import argparse
+import enum
+import asyncio
+import functools
+import shlex
 import sys
+import threading
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 # Colors for terminal output
 class Colors:
@@ -25,6 +32,37 @@ class Colors:
 DEFAULT_XCHAIN_CLI = "./bin/xchain-cli"
 # Default proposer address
 DEFAULT_ADDRESS = "TeyyPLpp9L7QAcxHangtcHTu7HUZ6iydY"
+# Run-wide flags, bound from the command line arguments in __main__
+VERBOSE = False
+INTERACTIVE = False
+ASSUME_YES = False
+ADDRESS = None
+# XChainClient for the run, created in __main__ from --cli/--host
+client = None
+# Monitor polling interval bounds (seconds); backs off exponentially while height is stalled
+POLL_BASE_INTERVAL = 3
+POLL_MAX_INTERVAL = 30
+# Confirmed transactions are immutable, so `tx query` results are cached by txid with no expiry
+TX_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "xtinychain", "tx")
+TX_CACHE_MAX_ENTRIES = 1000
+# Polling used to detect when a submitted transaction lands in a block
+TX_CONFIRM_POLL_INTERVAL = 0.5  # seconds
+TX_CONFIRM_TIMEOUT = 10  # seconds
+# Filter for `xchain-cli watch`; only block heights are needed, so leave transactions out
+WATCH_BLOCK_FILTER = '{"exclude_tx":true}'
+
+# Patterns used to pull values out of xchain-cli output
+_TXID_RE = re.compile(r"Tx id: ([a-f0-9]+)")
+_PID_RE = re.compile(r"contract response: (\d+)")
+_ADDR_RE = re.compile(r"address: ([A-Za-z0-9]+)")
+_ADDR_VALID_RE = re.compile(r"^[A-Za-z0-9]+$")
+# The terminator keeps a read that ends mid-number from matching a truncated height
+_TRUNK_HEIGHT_RE = re.compile(rb'"trunkHeight":\s*"?(\d+)["\s,}]')
+# Prefix xchain-cli puts before a contract's JSON result
+_CR_MARKER = "contract response: "
+
+# In-memory layer over TX_CACHE_DIR for the current run
+_tx_cache = {}
 
 # Configuration for proposal
 ProposalConfig = namedtuple('ProposalConfig', [
@@ -34,6 +72,19 @@ ProposalConfig = namedtuple('ProposalConfig', [
     'min_vote_percent'
 ])
 
+# Proposal statuses that end monitoring
+_DONE_STATES = frozenset({"completed_success", "completed", "passed"})
+_FAIL_STATES = frozenset({"rejected", "expired"})
+
+class MonitorPhase(enum.Enum):
+    """Where the chain is relative to the proposal's key heights"""
+    VOTING = "voting"
+    WAIT_TRIGGER = "wait_trigger"
+    POST_TRIGGER = "post_trigger"
+
+# Fields of the node status the monitor needs, parsed once per tick
+StatusSnapshot = namedtuple('StatusSnapshot', ['height', 'consensus_is_tdpos'])
+
 DEFAULT_CONFIG = ProposalConfig(
     vote_duration_blocks=40,  # ~2 minutes assuming 3 second blocks
     trigger_buffer=10,        # Buffer of 10 blocks
@@ -41,36 +92,74 @@ DEFAULT_CONFIG = ProposalConfig(
     min_vote_percent=51       # Default voting threshold
 )
 
+def extract_contract_response(output, default=None):
+    """Return the text after the contract response marker, or default if it is absent"""
+    i = output.find(_CR_MARKER)
+    if i < 0:
+        return default
+    return output[i + len(_CR_MARKER):]
+
+def _build_status_formats():
+    """Precompute the colored (before timestamp, after timestamp, after message) pieces for each status"""
+    def labeled(color, label):
+        return (f"{color}[", f"] {label}:{Colors.ENDC} ", "\n")
+    
+    return {
+        "info": labeled(Colors.BLUE, "INFO"),
+        "success": labeled(Colors.GREEN, "SUCCESS"),
+        "error": labeled(Colors.RED, "ERROR"),
+        "warning": labeled(Colors.YELLOW, "WARNING"),
+        "debug": labeled(Colors.CYAN, "DEBUG"),
+        "header": (f"\n{Colors.HEADER}{Colors.BOLD}[", "] ", f"{Colors.ENDC}\n\n"),
+    }
+
+_STATUS_FORMATS = _build_status_formats()
+
+def disable_colors():
+    """Strip ANSI color codes from all output, e.g. when stdout is not a terminal"""
+    global _STATUS_FORMATS
+    for attr in list(vars(Colors)):
+        if not attr.startswith("_"):
+            setattr(Colors, attr, "")
+    _STATUS_FORMATS = _build_status_formats()
+
 def print_status(message, status="info"):
     """Print formatted status messages"""
-    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-    prefix = f"[{timestamp}] "
-    
-    if status == "info":
-        print(f"{Colors.BLUE}{prefix}INFO:{Colors.ENDC} {message}")
-    elif status == "success":
-        print(f"{Colors.GREEN}{prefix}SUCCESS:{Colors.ENDC} {message}")
-    elif status == "error":
-        print(f"{Colors.RED}{prefix}ERROR:{Colors.ENDC} {message}")
-    elif status == "warning":
-        print(f"{Colors.YELLOW}{prefix}WARNING:{Colors.ENDC} {message}")
-    elif status == "debug":
-        if args.verbose:
-            print(f"{Colors.CYAN}{prefix}DEBUG:{Colors.ENDC} {message}")
-    elif status == "header":
-        print(f"\n{Colors.HEADER}{Colors.BOLD}{prefix}{message}{Colors.ENDC}\n")
-
-def run_command(cmd, show_output=True):
-    """Run a shell command and return the output with better error handling"""
-    if show_output or args.verbose:
-        print_status(f"Executing: {cmd}", "debug")
+    if status == "debug" and not VERBOSE:
+        return
+    
+    fmt = _STATUS_FORMATS.get(status)
+    if fmt is None:
+        return
+    
+    before, after, end = fmt
+    sys.stdout.write(before + time.strftime("%H:%M:%S") + after + message + end)
+
+def confirm(prompt, default):
+    """Ask a yes/no question; --yes accepts it and non-interactive runs take the default"""
+    if ASSUME_YES:
+        return True
+    if not INTERACTIVE:
+        return default
+    
+    answer = input(prompt).strip().lower()
+    if not answer:
+        return default
+    return answer == "y"
+
+def run_command(argv, show_output=True, show_errors=True):
+    """Run a command given as an argv list and return the output with better error handling"""
+    if show_output or VERBOSE:
+        print_status(f"Executing: {shlex.join(argv)}", "debug")
     
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        result = subprocess.run(argv, shell=False, capture_output=True, text=True)
         
         if result.returncode != 0:
-            print_status(f"Command failed: {cmd}", "error")
-            print_status(f"Error: {result.stderr}", "error")
+            # Expected failures (e.g. polling for a tx that is not indexed yet) are only shown when verbose
+            level = "error" if show_errors else "debug"
+            print_status(f"Command failed: {shlex.join(argv)}", level)
+            print_status(f"Error: {result.stderr}", level)
             return None
         
         return result.stdout.strip()
@@ -78,11 +167,192 @@ def run_command(cmd, show_output=True):
         print_status(f"Exception running command: {str(e)}", "error")
         return None
 
+def run_until(argv, sentinel_re, show_output=True):
+    """Stream a command's stdout until sentinel_re (a bytes pattern) matches, then stop the command
+    
+    Returns the match object, or None if the command ended without producing a match.
+    """
+    if show_output or VERBOSE:
+        print_status(f"Executing: {shlex.join(argv)}", "debug")
+    
+    try:
+        proc = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except Exception as e:
+        print_status(f"Exception running command: {str(e)}", "error")
+        return None
+    
+    buf = bytearray()
+    err = bytearray()
+    match = None
+    with proc, selectors.DefaultSelector() as sel:
+        sel.register(proc.stdout, selectors.EVENT_READ, buf)
+        sel.register(proc.stderr, selectors.EVENT_READ, err)
+        while sel.get_map() and match is None:
+            for key, _ in sel.select():
+                chunk = os.read(key.fd, 4096)
+                if not chunk:
+                    sel.unregister(key.fileobj)
+                    continue
+                key.data.extend(chunk)
+                if key.data is buf:
+                    match = sentinel_re.search(buf)
+        
+        if match is not None:
+            # Everything needed has arrived; no point reading (or letting the CLI print) the rest
+            proc.kill()
+            return match
+        
+        proc.wait()
+    
+    if proc.returncode != 0:
+        print_status(f"Command failed: {shlex.join(argv)}", "error")
+        print_status(f"Error: {err.decode(errors='replace')}", "error")
+    return None
+
+async def run_command_async(argv, show_output=True):
+    """Coroutine counterpart of run_command for use inside the monitor loop"""
+    if show_output or VERBOSE:
+        print_status(f"Executing: {shlex.join(argv)}", "debug")
+    
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await proc.communicate()
+        
+        if proc.returncode != 0:
+            print_status(f"Command failed: {shlex.join(argv)}", "error")
+            print_status(f"Error: {stderr.decode(errors='replace')}", "error")
+            return None
+        
+        return stdout.decode(errors="replace").strip()
+    except Exception as e:
+        print_status(f"Exception running command: {str(e)}", "error")
+        return None
+
+class XChainClient:
+    """Thin wrapper around xchain-cli mapping each node query to one method"""
+    
+    def __init__(self, cli, host=None):
+        self.base_argv = [cli]
+        if host:
+            self.base_argv += ["-H", host]
+    
+    def call(self, *argv, show_output=True, show_errors=True):
+        return run_command(self.base_argv + list(argv), show_output=show_output, show_errors=show_errors)
+    
+    async def call_async(self, *argv, show_output=True):
+        return await run_command_async(self.base_argv + list(argv), show_output=show_output)
+    
+    def version(self):
+        return self.call("--version", show_output=False)
+    
+    def default_account(self):
+        return self.call("account", "default")
+    
+    def trunk_height(self):
+        """Read only as much of `status` as needed to find the trunk height"""
+        match = run_until(self.base_argv + ["status"], _TRUNK_HEIGHT_RE)
+        return int(match.group(1)) if match else None
+    
+    def governance_query(self, address):
+        return self.call("governToken", "query", "-a", address)
+    
+    def governance_init(self):
+        return self.call("governToken", "init", "--fee", "1000")
+    
+    def propose(self, proposal_path):
+        return self.call("proposal", "propose", "--proposal", proposal_path, "--fee", "100")
+    
+    def vote(self, pid, amount):
+        return self.call("proposal", "vote", "--pid", pid, "--amount", str(amount), "--fee", "100")
+    
+    def proposal_query(self, pid):
+        return self.call("proposal", "query", "-p", pid)
+    
+    def tx_query(self, txid, show_output=True, show_errors=True):
+        return self.call("tx", "query", txid, show_output=show_output, show_errors=show_errors)
+    
+    async def status_async(self):
+        return await self.call_async("status")
+    
+    async def proposal_query_async(self, pid):
+        return await self.call_async("proposal", "query", "-p", pid)
+    
+    async def tx_query_async(self, txid):
+        return await self.call_async("tx", "query", txid)
+
+@functools.lru_cache(maxsize=1)
+def _cli_version():
+    """Run `xchain-cli --version` at most once per process"""
+    return client.version()
+
+@functools.lru_cache(maxsize=None)
+def _detect_default_address():
+    """Ask xchain-cli for its default account address at most once per process"""
+    result = client.default_account()
+    if not result:
+        return None
+    address_match = _ADDR_RE.search(result)
+    return address_match.group(1) if address_match else None
+
+def load_cached_tx(txid):
+    """Return a confirmed transaction from the in-memory or on-disk cache, or None"""
+    if txid in _tx_cache:
+        return _tx_cache[txid]
+    
+    try:
+        with open(os.path.join(TX_CACHE_DIR, f"{txid}.json")) as f:
+            tx_json = json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    
+    _tx_cache[txid] = tx_json
+    return tx_json
+
+def save_cached_tx(txid, tx_json):
+    """Cache a transaction once it is in a block, evicting the oldest entries beyond TX_CACHE_MAX_ENTRIES"""
+    if not tx_json.get("blockid") or not txid.isalnum():
+        return
+    
+    _tx_cache[txid] = tx_json
+    try:
+        os.makedirs(TX_CACHE_DIR, exist_ok=True)
+        with open(os.path.join(TX_CACHE_DIR, f"{txid}.json"), "w") as f:
+            f.write(json.dumps(tx_json, indent=2))
+        
+        entries = [entry for entry in os.scandir(TX_CACHE_DIR) if entry.name.endswith(".json")]
+        if len(entries) > TX_CACHE_MAX_ENTRIES:
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:len(entries) - TX_CACHE_MAX_ENTRIES]:
+                os.remove(entry.path)
+    except OSError as e:
+        print_status(f"Could not write transaction cache: {str(e)}", "debug")
+
+def await_tx_confirmed(txid, stop, timeout=TX_CONFIRM_TIMEOUT):
+    """Poll `tx query` until the transaction is in a block
+    
+    Returns False if that does not happen within timeout or the stop event is set.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and not stop.is_set():
+        output = client.tx_query(txid, show_output=False, show_errors=False)
+        if output:
+            try:
+                tx_json = json.loads(output)
+            except json.JSONDecodeError:
+                tx_json = {}
+            if tx_json.get("blockid"):
+                save_cached_tx(txid, tx_json)
+                return True
+        stop.wait(TX_CONFIRM_POLL_INTERVAL)
+    return False
+
 def check_xchain_cli():
     """Check if xchain-cli is available"""
     print_status("Checking if xchain-cli is available...", "header")
     
-    result = run_command(f"{args.cli} --version", show_output=False)
+    result = _cli_version()
     if not result:
         print_status("Could not find or execute xchain-cli. Please make sure it's installed and the path is correct.", "error")
         return False
@@ -94,88 +364,110 @@ def get_address():
     """Get and validate the user's address"""
     print_status("Checking address...", "header")
     
-    address = args.address
+    address = ADDRESS
     if not address:
         # Try to get default address from xchain-cli
-        result = run_command(f"{args.cli} account default")
-        if result and "address" in result:
-            try:
-                address_match = re.search(r"address: ([A-Za-z0-9]+)", result)
-                if address_match:
-                    address = address_match.group(1)
-                    use_default = input(f"Use default address {address}? (Y/n): ").strip().lower()
-                    if use_default and use_default != "y":
-                        address = input("Enter your address: ").strip()
-            except:
-                pass
+        address = _detect_default_address()
+        if address and not confirm(f"Use default address {address}? (Y/n): ", default=True):
+            address = input("Enter your address: ").strip()
     
-    if not address:
+    if not address and INTERACTIVE:
         address = input("Enter your address: ").strip()
-        if not address:
-            address = DEFAULT_ADDRESS
-            print_status(f"Using default address: {address}", "warning")
+    if not address:
+        address = DEFAULT_ADDRESS
+        print_status(f"Using default address: {address}", "warning")
     
     # Validate address format (basic check)
-    if not re.match(r"^[A-Za-z0-9]+$", address):
+    if not _ADDR_VALID_RE.match(address):
         print_status("Address format appears invalid. Continuing anyway, but this might cause issues.", "warning")
     
     return address
 
-def check_governance_initialized(address):
-    """Check if governance tokens have been initialized"""
+def check_governance_initialized(address, output):
+    """Check if governance tokens have been initialized, given `governToken query` output
+    
+    Returns (initialized, output), where output is the query result when the tokens
+    already existed, so get_governance_tokens can reuse it instead of querying again.
+    """
     print_status("Checking if governance tokens are initialized...", "header")
     
-    output = run_command(f"{args.cli} governToken query -a {address}")
     if not output:
-        if args.interactive:
-            init = input("Governance tokens not found. Would you like to initialize them? (y/N): ").strip().lower()
-            if init == 'y':
+        if INTERACTIVE or ASSUME_YES:
+            if confirm("Governance tokens not found. Would you like to initialize them? (y/N): ", default=False):
                 print_status("Attempting to initialize governance tokens...", "info")
-                init_output = run_command(f"{args.cli} governToken init --fee 1000")
+                init_output = client.governance_init()
                 if init_output and "Tx id:" in init_output:
                     print_status("Successfully initialized governance tokens.", "success")
-                    txid_match = re.search(r"Tx id: ([a-f0-9]+)", init_output)
+                    txid_match = _TXID_RE.search(init_output)
                     if txid_match:
                         print_status(f"Waiting for transaction to be confirmed...", "info")
                         time.sleep(5)  # Wait for confirmation
-                        return True
-                    return True
+                        return True, None
+                    return True, None
                 else:
                     print_status("Failed to initialize governance tokens.", "error")
-                    return False
+                    return False, None
             else:
                 print_status("Skipping governance token initialization.", "warning")
-                return False
+                return False, None
         else:
             print_status("Governance tokens not initialized.", "error")
-            return False
+            return False, None
     
     try:
         # Parse the balance from the response
-        response_text = output.split("contract response: ", 1)[1] if "contract response: " in output else output
+        response_text = extract_contract_response(output, default=output)
         response = json.loads(response_text)
         balance = response.get("total_balance", "0")
         print_status(f"Current governance token balance: {balance}", "success")
-        return True
+        return True, output
     except:
         print_status("Could not parse token balance, but governance appears to be initialized.", "warning")
-        return True
+        return True, output
 
-def get_current_height():
-    """Get the current blockchain height"""
-    output = run_command(f"{args.cli} status")
+def parse_status_output(output):
+    """Parse raw `status` output into a StatusSnapshot"""
     if not output:
         print_status("Failed to get blockchain status.", "error")
         return None
     
     try:
         status_json = json.loads(output)
-        current_height = int(status_json["blockchains"][0]["ledger"]["trunkHeight"])
-        print_status(f"Current blockchain height: {current_height}", "success")
-        return current_height
-    except (json.JSONDecodeError, KeyError) as e:
+        chain = status_json["blockchains"][0]
+        height = int(chain["ledger"]["trunkHeight"])
+    except (json.JSONDecodeError, KeyError, IndexError, TypeError, ValueError) as e:
         print_status(f"Error parsing blockchain height: {str(e)}", "error")
         return None
+    
+    try:
+        # Check the consensus name in the blockchain status, then double-check in consensus status
+        consensus_is_tdpos = (
+            chain.get("consensusName", "").lower() == "tdpos"
+            or chain.get("consensus", {}).get("name", "").lower() == "tdpos"
+        )
+    except Exception as e:
+        print_status(f"Error checking consensus status: {str(e)}", "debug")
+        consensus_is_tdpos = False
+    
+    return StatusSnapshot(height=height, consensus_is_tdpos=consensus_is_tdpos)
+
+def get_current_height(height=None):
+    """Get the current blockchain height, querying it unless an already fetched height is given"""
+    if height is None:
+        height = client.trunk_height()
+    if height is None:
+        print_status("Failed to get blockchain height.", "error")
+        return None
+    
+    print_status(f"Current blockchain height: {height}", "success")
+    return height
+
+async def fetch_status():
+    """Fetch the node status once per monitor tick"""
+    snap = parse_status_output(await client.status_async())
+    if snap:
+        print_status(f"Current blockchain height: {snap.height}", "success")
+    return snap
 
 def get_config_from_user(current_height):
     """Get proposal configuration from user"""
@@ -183,7 +475,7 @@ def get_config_from_user(current_height):
     
     config = DEFAULT_CONFIG
     
-    if args.interactive:
+    if INTERACTIVE:
         print(f"Current blockchain height: {current_height}")
         print(f"Default voting duration: {config.vote_duration_blocks} blocks")
         
@@ -219,13 +511,9 @@ def create_proposal_json(proposer, current_height, config_params):
     
     config, stop_vote_height, trigger_height, block_num_height = config_params
     
-    # Get current timestamp in nanoseconds (as integer instead of scientific notation)
+    # Get current timestamp in nanoseconds using integer math to avoid float rounding
     # Add 10 minutes worth of nanoseconds to ensure it's in the future
-    current_timestamp_ns = int(time.time() * 1e9)
-    future_timestamp_ns = current_timestamp_ns + (10 * 60 * 1e9)
-    
-    # Format as string without scientific notation
-    future_timestamp_str = str(int(future_timestamp_ns))
+    future_timestamp_ns = time.time_ns() + 10 * 60 * 1_000_000_000
     
     # Define proposal structure
     proposal = {
@@ -246,7 +534,7 @@ def create_proposal_json(proposer, current_height, config_params):
                     "period": "3000",
                     "alternate_interval": "6000",
                     "term_interval": "9000",
-                    "timestamp": future_timestamp_str,  # Use proper timestamp format
+                    "timestamp": str(future_timestamp_ns),  # Use proper timestamp format
                     "block_num": str(block_num_height),
                     "vote_unit_price": "1",
                     "init_proposer": {
@@ -262,15 +550,17 @@ def create_proposal_json(proposer, current_height, config_params):
     # Create directory if it doesn't exist
     os.makedirs("proposal-app", exist_ok=True)
     
-    # Write proposal to file
+    # Write proposal to a temp file and swap it in, so an interrupted write never leaves a corrupt proposal
     proposal_path = "proposal-app/proposal.json"
-    with open(proposal_path, "w") as f:
-        json.dump(proposal, f, indent=2)
+    tmp_path = proposal_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(json.dumps(proposal, indent=2))
+    os.replace(tmp_path, proposal_path)
     
     print_status(f"Created proposal at {os.path.abspath(proposal_path)}", "success")
     
     # Show the proposal to the user in interactive mode
-    if args.interactive:
+    if INTERACTIVE:
         show_proposal = input("Show proposal details? (y/N): ").strip().lower()
         if show_proposal == 'y':
             print(json.dumps(proposal, indent=2))
@@ -281,13 +571,11 @@ def submit_proposal(proposal_path):
     """Submit the proposal to the blockchain"""
     print_status("Submitting proposal...", "header")
     
-    if args.interactive:
-        confirm = input("Ready to submit proposal? (Y/n): ").strip().lower()
-        if confirm and confirm != 'y':
-            print_status("Proposal submission cancelled by user.", "warning")
-            return None
+    if not confirm("Ready to submit proposal? (Y/n): ", default=True):
+        print_status("Proposal submission cancelled by user.", "warning")
+        return None
     
-    result = run_command(f"{args.cli} proposal propose --proposal {proposal_path} --fee 100")
+    result = client.propose(proposal_path)
     if not result:
         print_status("Proposal submission failed.", "error")
         return None
@@ -295,8 +583,8 @@ def submit_proposal(proposal_path):
     print_status("Proposal submission result:", "success")
     
     # Extract the proposal ID and transaction ID
-    pid_match = re.search(r"contract response: (\d+)", result)
-    txid_match = re.search(r"Tx id: ([a-f0-9]+)", result)
+    pid_match = _PID_RE.search(result)
+    txid_match = _TXID_RE.search(result)
     
     pid = None
     txid = None
@@ -315,35 +603,41 @@ def submit_proposal(proposal_path):
         
         # If we couldn't get the PID directly, try to extract it from the transaction
         if not pid and txid:
-            tx_result = run_command(f"{args.cli} tx query {txid}")
+            tx_result = client.tx_query(txid)
             if tx_result:
+                try:
+                    tx_json = json.loads(tx_result)
+                except json.JSONDecodeError as e:
+                    print_status(f"Error parsing transaction: {str(e)}", "debug")
+                    tx_json = {}
+                
                 # Look for proposal ID in transaction outputs
-                for line in tx_result.split("\n"):
-                    if "bucket" in line and "proposal" in line and "key" in line:
-                        key_match = re.search(r"\"key\": \"(\d+)\"", line)
-                        if key_match:
-                            pid = key_match.group(1)
-                            print_status(f"Extracted Proposal ID from transaction: {pid}", "success")
-                            break
+                for output in tx_json.get("txOutputsExt", []):
+                    key = str(output.get("key", ""))
+                    if output.get("bucket") == "proposal" and key.isdigit():
+                        pid = key
+                        print_status(f"Extracted Proposal ID from transaction: {pid}", "success")
+                        break
     
     # If we still don't have a PID, ask for user input
-    if not pid and args.interactive:
+    if not pid and INTERACTIVE:
         pid = input("Could not automatically determine proposal ID. Please enter it manually: ").strip()
     
     return pid, txid
 
-def get_governance_tokens(address):
-    """Get the amount of governance tokens for an address"""
+def get_governance_tokens(address, output=None):
+    """Get the amount of governance tokens for an address, reusing `governToken query` output if given"""
     print_status(f"Checking governance tokens for {address}...", "header")
     
-    output = run_command(f"{args.cli} governToken query -a {address}")
+    if output is None:
+        output = client.governance_query(address)
     if not output:
         print_status("Failed to query governance tokens.", "error")
         return 0
     
     try:
         # Parse the response to get available balance
-        response_text = output.split("contract response: ", 1)[1] if "contract response: " in output else output
+        response_text = extract_contract_response(output, default=output)
         response = json.loads(response_text)
         
         total_balance = int(response.get("total_balance", 0))
@@ -375,7 +669,7 @@ def vote_on_proposal(pid, address, tokens):
     # Use slightly less than the total available to ensure it works
     voting_amount = int(tokens * 0.9)
     
-    if args.interactive:
+    if INTERACTIVE:
         user_amount = input(f"Enter amount to vote with (default: {voting_amount}): ").strip()
         if user_amount and user_amount.isdigit() and int(user_amount) > 0:
             voting_amount = int(user_amount)
@@ -385,7 +679,7 @@ def vote_on_proposal(pid, address, tokens):
     
     print_status(f"Voting with {voting_amount} tokens...", "info")
     
-    result = run_command(f"{args.cli} proposal vote --pid {pid} --amount {voting_amount} --fee 100")
+    result = client.vote(pid, voting_amount)
     if not result:
         print_status("Vote submission failed.", "error")
         return None
@@ -393,39 +687,38 @@ def vote_on_proposal(pid, address, tokens):
     print_status("Vote submitted successfully", "success")
     
     # Extract transaction ID
-    txid_match = re.search(r"Tx id: ([a-f0-9]+)", result)
+    txid_match = _TXID_RE.search(result)
     if txid_match:
         txid = txid_match.group(1)
         print_status(f"Vote Transaction ID: {txid}", "success")
-        
-        # Wait for transaction to be confirmed
-        print_status("Waiting for vote transaction to be confirmed...", "info")
-        time.sleep(5)
-        
         return txid
     
     return None
 
-def get_proposal_status(pid, txid=None):
+async def get_proposal_status(pid, txid=None):
     """Get the current status of a proposal"""
     # First try direct query
-    output = run_command(f"{args.cli} proposal query -p {pid}")
+    output = await client.proposal_query_async(pid)
     
-    if output and "contract response:" in output:
+    response_text = extract_contract_response(output) if output else None
+    if response_text is not None:
         try:
-            response_text = output.split("contract response: ", 1)[1]
             proposal_data = json.loads(response_text)
             return proposal_data
-        except (json.JSONDecodeError, IndexError) as e:
+        except json.JSONDecodeError as e:
             print_status(f"Error parsing proposal query: {str(e)}", "debug")
     
     # Fallback to transaction if we have one
     if txid:
         try:
-            tx_result = run_command(f"{args.cli} tx query {txid}")
-            if tx_result:
-                tx_json = json.loads(tx_result)
-                
+            tx_json = load_cached_tx(txid)
+            if tx_json is None:
+                tx_result = await client.tx_query_async(txid)
+                if tx_result:
+                    tx_json = json.loads(tx_result)
+                    save_cached_tx(txid, tx_json)
+            
+            if tx_json:
                 # Extract proposal information from transaction outputs
                 for output in tx_json.get("txOutputsExt", []):
                     if output.get("bucket") == "proposal" and output.get("key") == pid:
@@ -440,13 +733,15 @@ def get_proposal_status(pid, txid=None):
     
     return None
 
+# Precomputed "N minute(s)" strings for the common sub-hour countdowns
+_MIN_STRINGS = {m: f"{m} minute{'s' if m != 1 else ''}" for m in range(1, 60)}
+
 def format_time_remaining(seconds):
     """Format seconds into a readable time remaining string"""
     if seconds < 60:
         return f"{seconds} seconds"
     elif seconds < 3600:
-        minutes = seconds // 60
-        return f"{minutes} minute{'s' if minutes != 1 else ''}"
+        return _MIN_STRINGS[seconds // 60]
     else:
         hours = seconds // 3600
         minutes = (seconds % 3600) // 60
@@ -455,60 +750,148 @@ def format_time_remaining(seconds):
         else:
             return f"{hours} hour{'s' if hours != 1 else ''}"
 
-def check_consensus_status():
+class BlockWatcher:
+    """Follow new block heights through a long-lived `xchain-cli watch` subscription"""
+    
+    def __init__(self):
+        self.proc = None
+        self.height = None
+    
+    @property
+    def active(self):
+        return self.proc is not None and self.proc.returncode is None
+    
+    async def start(self):
+        """Start the subscription; returns False if xchain-cli could not be spawned"""
+        argv = client.base_argv + ["watch", "--oneline", "-f", WATCH_BLOCK_FILTER]
+        print_status(f"Executing: {shlex.join(argv)}", "debug")
+        try:
+            self.proc = await asyncio.create_subprocess_exec(
+                *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+            )
+        except OSError as e:
+            print_status(f"Could not subscribe to block events: {str(e)}", "debug")
+            return False
+        return True
+    
+    async def wait_for_height(self, target_height, timeout):
+        """Consume block events until one reaches target_height; returns False on timeout or if the subscription ends"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.height is None or self.height < target_height:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            try:
+                line = await asyncio.wait_for(self.proc.stdout.readline(), remaining)
+            except asyncio.TimeoutError:
+                return False
+            except ValueError:
+                # Event line exceeded the stream buffer limit; the reader discards it, so skip it
+                continue
+            if not line:
+                # Subscription ended, e.g. this xchain-cli or node does not support it
+                await self.close()
+                return False
+            try:
+                self.height = int(json.loads(line)["block_height"])
+            except (ValueError, KeyError, TypeError):
+                continue
+        return True
+    
+    async def close(self):
+        if self.active:
+            self.proc.kill()
+            await self.proc.wait()
+        self.proc = None
+
+async def wait_next_tick(watcher, target_height, timeout):
+    """Wait until the chain reaches target_height or timeout elapses, using block events when subscribed"""
+    if watcher.active:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await watcher.wait_for_height(target_height, timeout)
+        if watcher.active:
+            # The event stream can be ahead of `status`; never tick faster than the base poll interval
+            remaining = POLL_BASE_INTERVAL - (loop.time() - started)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+            return
+        print_status("Block event subscription ended, falling back to polling", "debug")
+    await asyncio.sleep(timeout)
+
+def check_consensus_status(snap):
     """Check if consensus has changed to tdpos"""
+    return snap is not None and snap.consensus_is_tdpos
+
+async def wait_vote_confirmed(vote_confirmation):
+    """Wait (bounded) for the background vote confirmation started by main"""
+    print_status("Waiting for vote transaction to be confirmed...", "info")
     try:
-        status_output = run_command(f"{args.cli} status", show_output=False)
-        if not status_output:
-            return False
-            
-        status_json = json.loads(status_output)
-        
-        # Check the consensus name in the blockchain status
-        consensus_name = status_json.get("blockchains", [{}])[0].get("consensusName", "")
-        if consensus_name.lower() == "tdpos":
-            return True
-            
-        # Double-check in consensus status 
-        consensus = status_json.get("blockchains", [{}])[0].get("consensus", {})
-        if consensus.get("name", "").lower() == "tdpos":
-            return True
-            
-        return False
-    except Exception as e:
-        print_status(f"Error checking consensus status: {str(e)}", "debug")
-        return False
+        confirmed = await asyncio.wait_for(asyncio.wrap_future(vote_confirmation), TX_CONFIRM_TIMEOUT)
+    except asyncio.TimeoutError:
+        confirmed = False
+    if confirmed:
+        print_status("Vote transaction confirmed", "success")
+    else:
+        print_status("Vote transaction not confirmed yet, monitoring anyway", "warning")
 
-def monitor_proposal(pid, txid=None, stop_vote_height=None, trigger_height=None):
-    """Monitor the status of the proposal with interactive UI"""
+async def monitor_proposal(pid, txid=None, stop_vote_height=None, trigger_height=None, vote_confirmation=None):
+    """Monitor the status of the proposal with interactive UI
+    
+    vote_confirmation is an optional concurrent.futures.Future from await_tx_confirmed;
+    the first tick fetches status while it completes, and queries the proposal only
+    afterwards so the displayed votes include our own.
+    """
     print_status(f"Monitoring proposal {pid}...", "header")
     
-    if args.interactive:
+    if INTERACTIVE:
         print(f"{Colors.BOLD}Press Ctrl+C to stop monitoring at any time{Colors.ENDC}")
     
     max_checks_after_trigger = 20  # Set a maximum number of checks after trigger height
     checks_after_trigger = 0
     
+    # Prefer being woken by new blocks over fixed sleeps; polling is the fallback
+    watcher = BlockWatcher()
+    await watcher.start()
+    
     try:
         last_height = None
+        last_height_change_ts = time.monotonic()
+        stall_count = 0
         while True:
-            # Get current blockchain height
-            current_height = get_current_height()
-            if not current_height:
+            # Status serves both the height and consensus checks
+            if vote_confirmation is not None:
+                # First tick: fetch status while the vote confirms
+                snap, _ = await asyncio.gather(fetch_status(), wait_vote_confirmed(vote_confirmation))
+                vote_confirmation = None
+            else:
+                snap = await fetch_status()
+            if not snap:
                 print_status("Failed to get blockchain height, retrying in 10 seconds...", "warning")
-                time.sleep(10)
+                await asyncio.sleep(10)
                 continue
             
+            current_height = snap.height
+            
             # Only show updates when height changes
-            if last_height is not None and current_height == last_height and not args.verbose:
-                # Wait a bit before checking again
-                time.sleep(3)
+            if last_height is not None and current_height == last_height and not VERBOSE:
+                # Back off exponentially while the height is not advancing
+                sleep_time = min(POLL_MAX_INTERVAL, POLL_BASE_INTERVAL * 2 ** stall_count)
+                stall_count += 1
+                stalled_for = int(time.monotonic() - last_height_change_ts)
+                print_status(f"Height unchanged for {stalled_for}s, next check in {sleep_time} seconds...", "debug")
+                # Only a block newer than any already seen may cut the backoff short
+                await wait_next_tick(watcher, max(current_height, watcher.height or 0) + 1, sleep_time)
                 continue
-                
+            
+            if current_height != last_height:
+                last_height_change_ts = time.monotonic()
+            stall_count = 0
             last_height = current_height
             
-            # Get proposal data
-            proposal_data = get_proposal_status(pid, txid)
+            # Only query the proposal once the height has moved; stalled ticks skip it
+            proposal_data = await get_proposal_status(pid, txid)
             
             if proposal_data:
                 status = proposal_data.get("status", "unknown")
@@ -526,30 +909,33 @@ def monitor_proposal(pid, txid=None, stop_vote_height=None, trigger_height=None)
                 except (ValueError, TypeError):
                     trigger_height = 0
                 
-                # Calculate time remaining based on block heights and estimated block time (3 seconds)
-                blocks_until_vote_end = max(0, stop_vote_height - current_height)
-                blocks_until_trigger = max(0, trigger_height - current_height)
+                # Work out the phase once per tick
+                if current_height < stop_vote_height:
+                    phase = MonitorPhase.VOTING
+                elif current_height < trigger_height:
+                    phase = MonitorPhase.WAIT_TRIGGER
+                else:
+                    phase = MonitorPhase.POST_TRIGGER
                 
                 seconds_per_block = 3  # Estimated seconds per block
-                vote_time_remaining = blocks_until_vote_end * seconds_per_block
-                trigger_time_remaining = blocks_until_trigger * seconds_per_block
                 
                 # Display status
                 print_status(f"Status: {status}, Votes: {vote_amount}", "info")
                 print_status(f"Current height: {current_height}, Stop vote: {stop_vote_height}, Trigger: {trigger_height}", "info")
                 
-                if blocks_until_vote_end > 0:
-                    print_status(f"Voting ends in {blocks_until_vote_end} blocks (~{format_time_remaining(vote_time_remaining)})", "info")
-                elif blocks_until_trigger > 0:
-                    print_status(f"Waiting for trigger in {blocks_until_trigger} blocks (~{format_time_remaining(trigger_time_remaining)})", "info")
+                if phase is MonitorPhase.VOTING:
+                    blocks_left = stop_vote_height - current_height
+                    print_status(f"Voting ends in {blocks_left} blocks (~{format_time_remaining(blocks_left * seconds_per_block)})", "info")
+                elif phase is MonitorPhase.WAIT_TRIGGER:
+                    blocks_left = trigger_height - current_height
+                    print_status(f"Waiting for trigger in {blocks_left} blocks (~{format_time_remaining(blocks_left * seconds_per_block)})", "info")
                 else:
                     print_status("Waiting for consensus change...", "info")
-                
-                # Check if consensus has changed
-                if current_height >= trigger_height:
+                    
+                    # Check if consensus has changed
                     checks_after_trigger += 1
                     
-                    if check_consensus_status():
+                    if check_consensus_status(snap):
                         print_status("SUCCESS: Consensus has been changed to tdpos", "success")
                         break
                     elif checks_after_trigger >= max_checks_after_trigger:
@@ -559,31 +945,38 @@ def monitor_proposal(pid, txid=None, stop_vote_height=None, trigger_height=None)
                     print_status(f"Consensus not changed yet. Checks remaining: {max_checks_after_trigger - checks_after_trigger}", "warning")
                 
                 # Check if proposal is completed
-                if status.lower() in ["completed_success", "completed", "passed"]:
+                status_lower = status.lower()
+                if status_lower in _DONE_STATES:
                     print_status(f"Proposal is {status}! Checking if consensus has changed...", "success")
-                    if check_consensus_status():
+                    if check_consensus_status(snap):
                         print_status("SUCCESS: Consensus has been changed to tdpos", "success")
                         break
-                elif status.lower() in ["rejected", "expired"]:
+                elif status_lower in _FAIL_STATES:
                     print_status(f"Proposal has been {status}. Monitoring complete.", "warning")
                     break
             else:
                 print_status(f"Could not retrieve status for proposal {pid}", "warning")
                 
                 # Check if consensus has changed anyways
-                if check_consensus_status():
+                if check_consensus_status(snap):
                     print_status("SUCCESS: Consensus has been changed to tdpos", "success")
                     break
             
-            # Wait before checking again
-            sleep_time = 10 if not args.verbose else 5
-            print_status(f"Next update in {sleep_time} seconds...", "debug")
-            time.sleep(sleep_time)
+            # Wait before checking again; before the trigger, wake early once the trigger height arrives.
+            # After it, wait the full interval so max_checks_after_trigger keeps its time budget.
+            sleep_time = 10 if not VERBOSE else 5
+            if trigger_height and current_height < trigger_height:
+                print_status(f"Next update in {sleep_time} seconds or at height {trigger_height}...", "debug")
+                await wait_next_tick(watcher, trigger_height, sleep_time)
+            else:
+                print_status(f"Next update in {sleep_time} seconds...", "debug")
+                # An unreachable target still drains block events while sleeping the full interval
+                await wait_next_tick(watcher, float("inf"), sleep_time)
             
-    except KeyboardInterrupt:
-        print_status("\nMonitoring stopped by user", "warning")
     except Exception as e:
         print_status(f"Error monitoring proposal: {str(e)}", "error")
+    finally:
+        await watcher.close()
 
 def main():
     """Main function to run the proposer script"""
@@ -593,13 +986,19 @@ def main():
     # Step 1: Get and validate address
     proposer_address = get_address()
     
+    # Steps 2 and 3 need the governance query and the chain height, which are
+    # independent of each other, so fetch both at once
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        governance_future = executor.submit(client.governance_query, proposer_address)
+        height_future = executor.submit(client.trunk_height)
+    
     # Step 2: Check if governance is initialized
-    initialized = check_governance_initialized(proposer_address)
-    if not initialized and not args.interactive:
+    initialized, governance_output = check_governance_initialized(proposer_address, governance_future.result())
+    if not initialized and not INTERACTIVE:
         sys.exit(1)
     
-    # Step 3: Get current height
-    current_height = get_current_height()
+    # Step 3: Get current height; if tokens were just initialized the prefetched height is stale
+    current_height = get_current_height(height_future.result() if governance_output else None)
     if not current_height:
         sys.exit(1)
     
@@ -616,8 +1015,8 @@ def main():
     
     pid, txid = pid_txid
     
-    # Step 7: Get governance tokens
-    tokens = get_governance_tokens(proposer_address)
+    # Step 7: Get governance tokens, reusing the step 2 query (proposing does not lock governance tokens)
+    tokens = get_governance_tokens(proposer_address, governance_output)
     
     # Step 8: Vote on proposal
     vote_txid = None
@@ -625,26 +1024,52 @@ def main():
         vote_txid = vote_on_proposal(pid, proposer_address, tokens)
     else:
         print_status("No governance tokens available for voting.", "error")
-        if args.interactive:
-            continue_anyway = input("Continue monitoring anyway? (Y/n): ").strip().lower()
-            if continue_anyway and continue_anyway != 'y':
-                sys.exit(1)
+        if not confirm("Continue monitoring anyway? (Y/n): ", default=True):
+            sys.exit(1)
     
     # Step 9: Monitor proposal status
     _, stop_vote_height, trigger_height, _ = config_params
-    monitor_proposal(pid, vote_txid or txid, stop_vote_height, trigger_height)
+    # Confirm the vote in the background while the monitor starts up, instead of a fixed sleep
+    stop_confirming = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        vote_confirmation = executor.submit(await_tx_confirmed, vote_txid, stop_confirming) if vote_txid else None
+        try:
+            asyncio.run(monitor_proposal(pid, vote_txid or txid, stop_vote_height, trigger_height, vote_confirmation))
+        except KeyboardInterrupt:
+            print_status("\nMonitoring stopped by user", "warning")
+        finally:
+            # Let the executor shut down promptly instead of waiting out the poll timeout
+            stop_confirming.set()
+
+def address_arg(value):
+    """argparse type for --address: reject obviously malformed addresses up front"""
+    if not _ADDR_VALID_RE.match(value):
+        raise argparse.ArgumentTypeError(f"invalid address: {value!r}")
+    return value
 
 if __name__ == "__main__":
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="TDPoS Consensus Proposal Tool")
     parser.add_argument("--cli", default=DEFAULT_XCHAIN_CLI, help=f"Path to xchain-cli (default: {DEFAULT_XCHAIN_CLI})")
-    parser.add_argument("--address", help="Address to use as proposer (default: auto-detect)")
-    parser.add_argument("--interactive", "-i", action="store_true", help="Run in interactive mode")
+    parser.add_argument("--host", help="Node address (ip:port) passed to xchain-cli (default: xchain-cli's own default)")
+    parser.add_argument("--address", type=address_arg, help="Address to use as proposer (default: auto-detect)")
+    parser.add_argument("--interactive", "-i", action="store_true", help="Prompt for parameters and confirmations (default: non-interactive)")
+    parser.add_argument("--yes", "-y", action="store_true", help="Answer yes to all confirmations, including governance token initialization")
     parser.add_argument("--verbose", "-v", action="store_true", help="Show verbose output")
     args = parser.parse_args()
     
-    # Enable interactive mode by default if running in a terminal
-    if sys.stdout.isatty() and not args.interactive:
-        args.interactive = True
+    # Fail fast before any work if xchain-cli cannot be executed
+    if shutil.which(args.cli) is None:
+        parser.error(f"xchain-cli not found or not executable: {args.cli}")
+    
+    # Colors are dead bytes when output goes to a pipe or log file
+    if not sys.stdout.isatty():
+        disable_colors()
+    
+    VERBOSE = args.verbose
+    INTERACTIVE = args.interactive
+    ASSUME_YES = args.yes
+    ADDRESS = args.address
+    client = XChainClient(args.cli, args.host)
     
     main()
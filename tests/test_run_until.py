@@ -0,0 +1,47 @@
+import importlib.util
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = ["change_to_tdpos.py", "change_blocktime.py"]
+
+# Writes argv[1], flushes, pauses so the reader sees a partial chunk, then writes argv[2]
+SPLIT_WRITER = (
+    "import sys, time\n"
+    "sys.stdout.write(sys.argv[1]); sys.stdout.flush()\n"
+    "time.sleep(0.02)\n"
+    "sys.stdout.write(sys.argv[2]); sys.stdout.flush()\n"
+)
+
+
+def load_script(name):
+    spec = importlib.util.spec_from_file_location(name[:-3], os.path.join(ROOT, name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class RunUntilTrunkHeightTest(unittest.TestCase):
+    def check_every_split(self, module, output, expected):
+        for i in range(len(output) + 1):
+            argv = [sys.executable, "-c", SPLIT_WRITER, output[:i], output[i:]]
+            match = module.run_until(argv, module._TRUNK_HEIGHT_RE, show_output=False)
+            self.assertIsNotNone(match, f"no match when split at {i}")
+            self.assertEqual(int(match.group(1)), expected, f"wrong height when split at {i}")
+
+    def test_numeric_height_split_at_every_offset(self):
+        output = '{"blockchains": [{"ledger": {"trunkHeight": 12345, "rootBlockid": "ab"}}]}\n'
+        for name in SCRIPTS:
+            with self.subTest(script=name):
+                self.check_every_split(load_script(name), output, 12345)
+
+    def test_string_height_split_at_every_offset(self):
+        output = '{"ledger":{"trunkHeight":"12345"}}'
+        for name in SCRIPTS:
+            with self.subTest(script=name):
+                self.check_every_split(load_script(name), output, 12345)
+
+
+if __name__ == "__main__":
+    unittest.main()